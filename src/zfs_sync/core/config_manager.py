@@ -5,10 +5,12 @@ This module provides functions for managing configurations for the ZFS sync tool
 """
 
 import os
+import stat
+import tempfile
 import json
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Set, Tuple, Union
 
 logger = logging.getLogger('zfs_sync.core.config_manager')
 
@@ -16,6 +18,19 @@ class ConfigError(Exception):
     """Exception raised for errors in configuration operations."""
     pass
 
+# Configuration directories already created by this process
+_created_config_dirs: Set[Path] = set()
+
+# Raw configuration text per path, with the (mtime_ns, size) it was read at.
+# The text is cached rather than the parsed dict: json.loads of it is
+# cheaper than deep-copying the dict on every hit, and gives each caller
+# its own objects to mutate.
+_config_cache: Dict[str, Tuple[Tuple[int, int], str]] = {}
+
+def invalidate_config_cache() -> None:
+    """Forget any cached configuration so the next load reads the file."""
+    _config_cache.clear()
+
 def get_config_dir() -> Path:
     """
     Get the configuration directory.
@@ -24,7 +39,12 @@ def get_config_dir() -> Path:
         Path to the configuration directory
     """
     config_dir = Path.home() / '.zfs_sync'
-    config_dir.mkdir(exist_ok=True)
+    
+    # Only create the directory once per process
+    if config_dir not in _created_config_dirs:
+        config_dir.mkdir(exist_ok=True)
+        _created_config_dirs.add(config_dir)
+    
     return config_dir
 
 def get_config_path() -> Path:
@@ -45,15 +65,31 @@ def load_config() -> Dict[str, Any]:
     """
     config_path = get_config_path()
     
-    if not config_path.exists():
+    # A single stat both detects a missing file and feeds the cache check
+    try:
+        st = os.stat(config_path)
+    except FileNotFoundError:
         return create_default_config()
     
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        # Skip the read while the file is unchanged on disk
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = _config_cache.get(str(config_path))
+        if cached is not None and cached[0] == stamp:
+            text = cached[1]
+        else:
+            with open(config_path, 'r') as f:
+                text = f.read()
         
-        # Validate the configuration
-        validate_config(config)
+        config = json.loads(text)
+        
+        # Fill in anything the file leaves out (e.g. from an older version)
+        config = _deep_merge(get_default_config(), config)
+        
+        # The same text always validates the same way, so only check it once
+        if cached is None or cached[0] != stamp:
+            validate_config(config)
+            _config_cache[str(config_path)] = (stamp, text)
         
         return config
     except json.JSONDecodeError as e:
@@ -63,6 +99,65 @@ def load_config() -> Dict[str, Any]:
         logger.error(f"Failed to load configuration: {e}")
         raise ConfigError(f"Failed to load configuration: {e}")
 
+def _deep_merge(defaults: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge overrides into defaults, recursing into nested dictionaries.
+    
+    Args:
+        defaults: Default values
+        overrides: Values that take precedence
+        
+    Returns:
+        New merged dictionary
+    """
+    merged = dict(defaults)
+    
+    for key, value in overrides.items():
+        default = merged.get(key)
+        # Only recurse when both sides are plain dicts; anything else is replaced as-is
+        if type(value) is dict and type(default) is dict:
+            merged[key] = _deep_merge(default, value)
+        else:
+            merged[key] = value
+    
+    return merged
+
+def _write_config_file(config_path: Path, data: str) -> None:
+    """
+    Atomically replace the configuration file with new contents.
+    
+    The data is written and fsynced to a uniquely named temporary file in
+    the configuration directory, given the existing file's permissions
+    (0600 for a new file), and then renamed over it, so a crash mid-write
+    leaves either the old file or the new one, never a truncated one.
+    
+    Args:
+        config_path: Path to the configuration file
+        data: Serialized configuration
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(config_path).st_mode)
+    except FileNotFoundError:
+        mode = 0o600
+    
+    tmp_file = tempfile.NamedTemporaryFile(
+        'w', dir=config_path.parent, prefix=config_path.name + '.',
+        suffix='.tmp', delete=False
+    )
+    try:
+        with tmp_file as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_file.name, mode)
+        os.replace(tmp_file.name, config_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_file.name)
+        except OSError:
+            pass
+        raise
+
 def save_config(config: Dict[str, Any]) -> None:
     """
     Save the configuration to the configuration file.
@@ -76,22 +171,27 @@ def save_config(config: Dict[str, Any]) -> None:
         # Validate the configuration before saving
         validate_config(config)
         
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=4)
+        # Serialize up front so the file is written in one call and isn't
+        # truncated if serialization fails part way through
+        data = json.dumps(config, indent=4)
+        
+        _write_config_file(config_path, data)
+        
+        invalidate_config_cache()
         
         logger.info(f"Configuration saved to {config_path}")
     except Exception as e:
         logger.error(f"Failed to save configuration: {e}")
         raise ConfigError(f"Failed to save configuration: {e}")
 
-def create_default_config() -> Dict[str, Any]:
+def get_default_config() -> Dict[str, Any]:
     """
-    Create a default configuration.
+    Get the default configuration without writing it to disk.
     
     Returns:
         Default configuration dictionary
     """
-    config = {
+    return {
         "version": 1,
         "default_source_dataset": "tank/media",
         "default_destination_server": "localhost",
@@ -107,12 +207,21 @@ def create_default_config() -> Dict[str, Any]:
         },
         "saved_configurations": []
     }
+
+def create_default_config() -> Dict[str, Any]:
+    """
+    Create a default configuration.
+    
+    Returns:
+        Default configuration dictionary
+    """
+    config = get_default_config()
     
     # Save the default configuration
     try:
         config_path = get_config_path()
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=4)
+        data = json.dumps(config, indent=4)
+        _write_config_file(config_path, data)
         
         logger.info(f"Default configuration created at {config_path}")
     except Exception as e:
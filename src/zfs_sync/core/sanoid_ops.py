@@ -6,10 +6,18 @@ This module provides functions for interacting with sanoid for snapshot manageme
 
 import logging
 import subprocess
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 import os
 import re
+import shutil
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Union
+from typing import Callable, List, Dict, Optional, Tuple, Union
+
+from .zfs_ops import ZFSOperationError, invalidate_caches, resolve_executable
 
 logger = logging.getLogger('zfs_sync.core.sanoid_ops')
 
@@ -17,6 +25,25 @@ class SanoidOperationError(Exception):
     """Exception raised for errors in Sanoid operations."""
     pass
 
+# Seconds a snapshot listing is reused. Changes made through this tool invalidate
+# the cache straight away; the TTL bounds staleness from sanoid cron runs,
+# other hosts and anything else that changes snapshots behind our back.
+SNAPSHOT_CACHE_TTL = 5.0
+
+# (time.monotonic() of the listing, snapshots) per dataset. The epoch stops a
+# listing that raced with a change from being cached.
+_snapshot_cache: Dict[str, Tuple[float, List[Dict[str, str]]]] = {}
+_snapshot_cache_epoch = 0
+_snapshot_cache_lock = threading.Lock()
+
+def invalidate_snapshot_cache() -> None:
+    """Forget all cached snapshot listings."""
+    global _snapshot_cache_epoch
+    
+    with _snapshot_cache_lock:
+        _snapshot_cache.clear()
+        _snapshot_cache_epoch += 1
+
 def run_command(command: List[str], check: bool = True) -> Tuple[str, str]:
     """
     Run a command and return its output.
@@ -31,14 +58,17 @@ def run_command(command: List[str], check: bool = True) -> Tuple[str, str]:
     Raises:
         SanoidOperationError: If the command fails and check is True
     """
-    logger.debug(f"Running command: {' '.join(command)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Running command: %s", ' '.join(command))
     
     try:
+        # close_fds=False: see resolve_executable
         process = subprocess.Popen(
-            command,
+            resolve_executable(command),
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True
+            text=True,
+            close_fds=False
         )
         stdout, stderr = process.communicate()
         
@@ -47,30 +77,99 @@ def run_command(command: List[str], check: bool = True) -> Tuple[str, str]:
         
         return stdout, stderr
     except Exception as e:
-        logger.error(f"Error running command: {e}")
+        logger.error("Error running command: %s", e)
         raise SanoidOperationError(f"Error running command: {e}")
 
-def get_sanoid_path() -> str:
+# Output lines of a streamed command kept for the return value and error messages
+STREAM_TAIL_LINES = 500
+
+def stream_command(command: List[str], on_output: Optional[Callable[[str], None]] = None) -> str:
     """
-    Get the path to the sanoid script.
+    Run a command, handing each output line to a callback as it arrives.
+    
+    stdout and stderr are merged and read line by line (a bare carriage
+    return, as used by progress meters, also ends a line), so long-running
+    commands report progress while they run and memory use stays bounded.
     
+    Args:
+        command: List of command and arguments
+        on_output: Called with each output line, without the line ending
+        
     Returns:
-        Path to the sanoid script
+        The last STREAM_TAIL_LINES lines of output
+        
+    Raises:
+        SanoidOperationError: If the command can't be started or exits non-zero
     """
-    # Check if sanoid is in the current directory
-    current_dir = Path.cwd()
-    sanoid_path = current_dir / "libs" / "sanoid" / "sanoid"
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Streaming command: %s", ' '.join(command))
     
-    if sanoid_path.exists():
-        return str(sanoid_path)
+    tail = deque(maxlen=STREAM_TAIL_LINES)
     
-    # Check if sanoid is in the PATH
     try:
-        stdout, _ = run_command(["which", "sanoid"])
-        return stdout.strip()
-    except SanoidOperationError:
-        # If not found, use the default path
-        return "/usr/local/bin/sanoid"
+        # close_fds=False: see resolve_executable
+        process = subprocess.Popen(
+            resolve_executable(command),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            close_fds=False
+        )
+    except (OSError, ZFSOperationError) as e:
+        logger.error("Error running command: %s", e)
+        raise SanoidOperationError(f"Error running command: {e}")
+    
+    with process:
+        for line in process.stdout:
+            line = line.rstrip('\n')
+            if not line:
+                continue
+            tail.append(line)
+            if on_output is not None:
+                on_output(line)
+    
+    output = '\n'.join(tail)
+    
+    if process.returncode != 0:
+        raise SanoidOperationError(f"Command failed with exit code {process.returncode}: {output}")
+    
+    return output
+
+@lru_cache(maxsize=None)
+def _find_tool(name: str) -> str:
+    """
+    Locate a sanoid/syncoid script.
+    
+    The result is cached for the life of the process.
+    
+    Args:
+        name: Script name ("sanoid" or "syncoid")
+        
+    Returns:
+        Path to the script
+    """
+    # Check if the script is in the bundled libs directory
+    bundled_path = Path.cwd() / "libs" / "sanoid" / name
+    
+    if bundled_path.exists():
+        return str(bundled_path)
+    
+    # Check if the script is in the PATH (no subprocess needed)
+    path = shutil.which(name)
+    if path:
+        return path
+    
+    # If not found, use the default path
+    return f"/usr/local/bin/{name}"
+
+def get_sanoid_path() -> str:
+    """
+    Get the path to the sanoid script.
+    
+    Returns:
+        Path to the sanoid script
+    """
+    return _find_tool("sanoid")
 
 def get_syncoid_path() -> str:
     """
@@ -79,20 +178,7 @@ def get_syncoid_path() -> str:
     Returns:
         Path to the syncoid script
     """
-    # Check if syncoid is in the current directory
-    current_dir = Path.cwd()
-    syncoid_path = current_dir / "libs" / "sanoid" / "syncoid"
-    
-    if syncoid_path.exists():
-        return str(syncoid_path)
-    
-    # Check if syncoid is in the PATH
-    try:
-        stdout, _ = run_command(["which", "syncoid"])
-        return stdout.strip()
-    except SanoidOperationError:
-        # If not found, use the default path
-        return "/usr/local/bin/syncoid"
+    return _find_tool("syncoid")
 
 def create_sanoid_config(config_path: str, datasets: Dict[str, Dict[str, Union[str, int]]]) -> None:
     """
@@ -137,8 +223,10 @@ def take_snapshots(config_path: Optional[str] = None) -> None:
         logger.info("Snapshots created successfully")
         return stdout
     except SanoidOperationError as e:
-        logger.error(f"Failed to take snapshots: {e}")
+        logger.error("Failed to take snapshots: %s", e)
         raise
+    finally:
+        invalidate_caches()
 
 def prune_snapshots(config_path: Optional[str] = None) -> None:
     """
@@ -158,17 +246,28 @@ def prune_snapshots(config_path: Optional[str] = None) -> None:
         logger.info("Snapshots pruned successfully")
         return stdout
     except SanoidOperationError as e:
-        logger.error(f"Failed to prune snapshots: {e}")
+        logger.error("Failed to prune snapshots: %s", e)
         raise
+    finally:
+        invalidate_caches()
 
-def sync_dataset(source: str, target: str, options: Optional[Dict[str, Union[str, bool]]] = None) -> None:
+def sync_dataset(
+    source: str,
+    target: str,
+    options: Optional[Dict[str, Union[str, bool]]] = None,
+    on_output: Optional[Callable[[str], None]] = None
+) -> None:
     """
     Sync a dataset using syncoid.
     
+    Syncoid's output is streamed rather than buffered, so progress can be
+    shown while a long replication runs.
+    
     Args:
         source: Source dataset
         target: Target dataset
         options: Dictionary of options to pass to syncoid
+        on_output: Called with each line of syncoid output as it arrives
     """
     syncoid_path = get_syncoid_path()
     
@@ -185,12 +284,72 @@ def sync_dataset(source: str, target: str, options: Optional[Dict[str, Union[str
     command.extend([source, target])
     
     try:
-        stdout, stderr = run_command(command)
-        logger.info(f"Dataset {source} synced to {target} successfully")
+        stdout = stream_command(command, on_output)
+        logger.info("Dataset %s synced to %s successfully", source, target)
         return stdout
     except SanoidOperationError as e:
-        logger.error(f"Failed to sync dataset {source} to {target}: {e}")
+        logger.error("Failed to sync dataset %s to %s: %s", source, target, e)
         raise
+    finally:
+        invalidate_caches()
+
+# syncoid processes sync_datasets runs at the same time
+MAX_PARALLEL_SYNCS = 4
+
+def sync_datasets(
+    jobs: List[Tuple[str, str]],
+    options: Optional[Dict[str, Union[str, bool]]] = None,
+    on_output: Optional[Callable[[str, str], None]] = None,
+    max_workers: int = MAX_PARALLEL_SYNCS
+) -> List[str]:
+    """
+    Sync several datasets using syncoid, running up to max_workers at once.
+    
+    Each syncoid run spends most of its time waiting on the network and
+    disks, so running them side by side overlaps that waiting instead of
+    leaving the link idle between datasets. Every job is attempted even if
+    others fail.
+    
+    Args:
+        jobs: (source, target) dataset pairs
+        options: Dictionary of options to pass to syncoid for every job
+        on_output: Called with (source, line) for each line of syncoid output.
+            It runs on the worker threads, possibly several at once, so it
+            must be thread-safe; a Textual caller must not update widgets
+            from it directly but hand the line over with app.call_from_thread
+        max_workers: Maximum number of syncoid processes to run at once
+        
+    Returns:
+        The output of each job, in the same order as jobs
+        
+    Raises:
+        SanoidOperationError: If any of the syncs failed
+    """
+    if not jobs:
+        return []
+    
+    def run(source: str, target: str) -> str:
+        callback = None
+        if on_output is not None:
+            callback = lambda line: on_output(source, line)
+        return sync_dataset(source, target, options, callback)
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+        futures = [executor.submit(run, source, target) for source, target in jobs]
+    
+    outputs = []
+    failed = []
+    for (source, target), future in zip(jobs, futures):
+        try:
+            outputs.append(future.result())
+        except SanoidOperationError as e:
+            outputs.append("")
+            failed.append(f"{source} -> {target}: {e}")
+    
+    if failed:
+        raise SanoidOperationError(f"Failed to sync datasets: {'; '.join(failed)}")
+    
+    return outputs
 
 def list_snapshots(dataset: str) -> List[Dict[str, str]]:
     """
@@ -200,33 +359,40 @@ def list_snapshots(dataset: str) -> List[Dict[str, str]]:
         dataset: Dataset name
         
     Returns:
-        List of snapshots with their properties
+        List of snapshots with their properties, oldest first
     """
+    with _snapshot_cache_lock:
+        cached = _snapshot_cache.get(dataset)
+        epoch = _snapshot_cache_epoch
+    
+    if cached is not None and time.monotonic() - cached[0] < SNAPSHOT_CACHE_TTL:
+        return list(cached[1])
+    
     try:
-        stdout, _ = run_command(["zfs", "list", "-H", "-t", "snapshot", "-o", "name,creation", "-r", dataset])
+        stdout, _ = run_command(["zfs", "list", "-H", "-t", "snapshot", "-o", "name,creation", "-s", "createtxg", "-d", "1", dataset])
         
         snapshots = []
         for line in stdout.splitlines():
-            if not line.strip():
+            name, sep, creation = line.partition('\t')
+            if not sep:
                 continue
             
-            parts = line.split('\t')
-            if len(parts) >= 2:
-                name = parts[0]
-                creation = parts[1]
-                
-                # Extract snapshot name from full path
-                snapshot_name = name.split('@')[1] if '@' in name else name
-                
-                snapshots.append({
-                    'name': name,
-                    'snapshot_name': snapshot_name,
-                    'creation': creation
-                })
+            # Extract snapshot name from full path
+            snapshot_name = name.partition('@')[2] or name
+            
+            snapshots.append({
+                'name': name,
+                'snapshot_name': snapshot_name,
+                'creation': creation
+            })
+        
+        with _snapshot_cache_lock:
+            if epoch == _snapshot_cache_epoch:
+                _snapshot_cache[dataset] = (time.monotonic(), snapshots)
         
-        return snapshots
+        return list(snapshots)
     except SanoidOperationError as e:
-        logger.error(f"Failed to list snapshots for dataset {dataset}: {e}")
+        logger.error("Failed to list snapshots for dataset %s: %s", dataset, e)
         raise
 
 def get_latest_snapshot(dataset: str) -> Optional[str]:
@@ -244,12 +410,10 @@ def get_latest_snapshot(dataset: str) -> Optional[str]:
         if not snapshots:
             return None
         
-        # Sort by creation time (newest first)
-        snapshots.sort(key=lambda x: x['creation'], reverse=True)
-        
-        return snapshots[0]['name']
+        # list_snapshots is already ordered oldest to newest
+        return snapshots[-1]['name']
     except SanoidOperationError as e:
-        logger.error(f"Failed to get latest snapshot for dataset {dataset}: {e}")
+        logger.error("Failed to get latest snapshot for dataset %s: %s", dataset, e)
         raise
 
 def find_matching_snapshots(source_dataset: str, target_dataset: str) -> List[str]:
@@ -264,17 +428,19 @@ def find_matching_snapshots(source_dataset: str, target_dataset: str) -> List[st
         List of matching snapshot names
     """
     try:
-        source_snapshots = list_snapshots(source_dataset)
-        target_snapshots = list_snapshots(target_dataset)
-        
-        source_snapshot_names = [s['snapshot_name'] for s in source_snapshots]
-        target_snapshot_names = [s['snapshot_name'] for s in target_snapshots]
+        # The two listings are independent, so run them concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            source_future = executor.submit(list_snapshots, source_dataset)
+            target_future = executor.submit(list_snapshots, target_dataset)
+            source_snapshots = source_future.result()
+            target_snapshots = target_future.result()
         
-        matching_snapshots = list(set(source_snapshot_names) & set(target_snapshot_names))
+        source_snapshot_names = {s['snapshot_name'] for s in source_snapshots}
+        matching_snapshots = list(source_snapshot_names.intersection(s['snapshot_name'] for s in target_snapshots))
         
         return matching_snapshots
     except SanoidOperationError as e:
-        logger.error(f"Failed to find matching snapshots: {e}")
+        logger.error("Failed to find matching snapshots: %s", e)
         raise
 
 def create_snapshot(dataset: str, snapshot_name: str) -> str:
@@ -292,11 +458,13 @@ def create_snapshot(dataset: str, snapshot_name: str) -> str:
     
     try:
         run_command(["zfs", "snapshot", full_snapshot_name])
-        logger.info(f"Snapshot {full_snapshot_name} created successfully")
+        logger.info("Snapshot %s created successfully", full_snapshot_name)
         return full_snapshot_name
     except SanoidOperationError as e:
-        logger.error(f"Failed to create snapshot {full_snapshot_name}: {e}")
+        logger.error("Failed to create snapshot %s: %s", full_snapshot_name, e)
         raise
+    finally:
+        invalidate_caches()
 
 def delete_snapshot(snapshot: str) -> None:
     """
@@ -307,10 +475,57 @@ def delete_snapshot(snapshot: str) -> None:
     """
     try:
         run_command(["zfs", "destroy", snapshot])
-        logger.info(f"Snapshot {snapshot} deleted successfully")
+        logger.info("Snapshot %s deleted successfully", snapshot)
     except SanoidOperationError as e:
-        logger.error(f"Failed to delete snapshot {snapshot}: {e}")
+        logger.error("Failed to delete snapshot %s: %s", snapshot, e)
         raise
+    finally:
+        invalidate_caches()
+
+# Snapshots destroyed per zfs destroy call
+DESTROY_BATCH_SIZE = 50
+
+def delete_snapshots(snapshots: List[str]) -> None:
+    """
+    Delete several snapshots, batching them per dataset.
+    
+    Snapshots of the same dataset are destroyed with a single
+    ``zfs destroy dataset@snap1,snap2,...`` call. If a batch fails, its
+    snapshots are retried one at a time so a single bad name doesn't keep
+    the rest from being removed.
+    
+    Args:
+        snapshots: Full snapshot names (dataset@snapshot_name)
+        
+    Raises:
+        SanoidOperationError: If any snapshot could not be deleted
+    """
+    by_dataset: Dict[str, List[str]] = defaultdict(list)
+    for snapshot in snapshots:
+        dataset, _, snapshot_name = snapshot.partition('@')
+        by_dataset[dataset].append(snapshot_name)
+    
+    failed = []
+    
+    try:
+        for dataset, names in by_dataset.items():
+            for i in range(0, len(names), DESTROY_BATCH_SIZE):
+                batch = names[i:i + DESTROY_BATCH_SIZE]
+                try:
+                    run_command(["zfs", "destroy", f"{dataset}@{','.join(batch)}"])
+                    logger.info("Deleted %s snapshot(s) of %s", len(batch), dataset)
+                except SanoidOperationError as e:
+                    logger.warning("Batch destroy failed for %s, retrying individually: %s", dataset, e)
+                    for name in batch:
+                        try:
+                            delete_snapshot(f"{dataset}@{name}")
+                        except SanoidOperationError:
+                            failed.append(f"{dataset}@{name}")
+    finally:
+        invalidate_caches()
+    
+    if failed:
+        raise SanoidOperationError(f"Failed to delete snapshots: {', '.join(failed)}")
 
 def create_default_sanoid_config(config_path: str, dataset: str) -> None:
     """
@@ -327,4 +542,4 @@ def create_default_sanoid_config(config_path: str, dataset: str) -> None:
     }
     
     create_sanoid_config(config_path, datasets)
-    logger.info(f"Default sanoid configuration created at {config_path}")
\ No newline at end of file
+    logger.info("Default sanoid configuration created at %s", config_path)
\ No newline at end of file
@@ -4,14 +4,34 @@ SSH Operations Module
 This module provides functions for interacting with remote servers via SSH.
 """
 
+import atexit
 import logging
 import subprocess
 import os
-import paramiko
+import shlex
+import threading
+from collections import defaultdict
 from typing import List, Dict, Optional, Tuple, Union, Callable
 
 logger = logging.getLogger('zfs_sync.core.ssh_ops')
 
+# Hostnames that refer to the machine we are running on
+LOCAL_HOSTNAMES = ('localhost', '127.0.0.1', '::1')
+
+# Concurrent remote commands allowed per host; stays below sshd's
+# MaxSessions/MaxStartups default of 10 so requests aren't refused
+MAX_SSH_CONCURRENCY = 8
+
+_host_semaphores: Dict[str, threading.BoundedSemaphore] = defaultdict(
+    lambda: threading.BoundedSemaphore(MAX_SSH_CONCURRENCY)
+)
+_host_semaphores_lock = threading.Lock()
+
+def _get_host_semaphore(hostname: str) -> threading.BoundedSemaphore:
+    """Get the semaphore limiting concurrent commands to a host."""
+    with _host_semaphores_lock:
+        return _host_semaphores[hostname]
+
 class SSHOperationError(Exception):
     """Exception raised for errors in SSH operations."""
     pass
@@ -44,7 +64,7 @@ class SSHConnection:
         self.password = password
         self.client = None
         
-        logger.debug(f"Initialized SSH connection to {self.username}@{self.hostname}:{self.port}")
+        logger.debug("Initialized SSH connection to %s@%s:%s", self.username, self.hostname, self.port)
     
     def connect(self) -> None:
         """
@@ -53,6 +73,14 @@ class SSHConnection:
         Raises:
             SSHOperationError: If connection fails
         """
+        try:
+            # Imported here so that code paths which never open a connection
+            # (CLI job commands, known_hosts lookups) don't pay for paramiko
+            import paramiko
+        except ImportError as e:
+            logger.error(f"paramiko is not available: {e}")
+            raise SSHOperationError(f"paramiko is required for SSH connections: {e}")
+        
         try:
             self.client = paramiko.SSHClient()
             self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
@@ -69,7 +97,7 @@ class SSHConnection:
                 connect_kwargs['password'] = self.password
             
             self.client.connect(**connect_kwargs)
-            logger.debug(f"Connected to {self.username}@{self.hostname}:{self.port}")
+            logger.debug("Connected to %s@%s:%s", self.username, self.hostname, self.port)
         except Exception as e:
             logger.error(f"Failed to connect to {self.username}@{self.hostname}:{self.port}: {e}")
             raise SSHOperationError(f"Failed to connect: {e}")
@@ -79,7 +107,7 @@ class SSHConnection:
         if self.client:
             self.client.close()
             self.client = None
-            logger.debug(f"Disconnected from {self.username}@{self.hostname}:{self.port}")
+            logger.debug("Disconnected from %s@%s:%s", self.username, self.hostname, self.port)
     
     def execute_command(self, command: str) -> Tuple[str, str, int]:
         """
@@ -98,14 +126,15 @@ class SSHConnection:
             self.connect()
         
         try:
-            logger.debug(f"Executing command on {self.hostname}: {command}")
-            stdin, stdout, stderr = self.client.exec_command(command)
-            exit_code = stdout.channel.recv_exit_status()
+            logger.debug("Executing command on %s: %s", self.hostname, command)
+            with _get_host_semaphore(self.hostname):
+                stdin, stdout, stderr = self.client.exec_command(command)
+                exit_code = stdout.channel.recv_exit_status()
+                
+                stdout_str = stdout.read().decode('utf-8')
+                stderr_str = stderr.read().decode('utf-8')
             
-            stdout_str = stdout.read().decode('utf-8')
-            stderr_str = stderr.read().decode('utf-8')
-            
-            logger.debug(f"Command exit code: {exit_code}")
+            logger.debug("Command exit code: %s", exit_code)
             return stdout_str, stderr_str, exit_code
         except Exception as e:
             logger.error(f"Failed to execute command: {e}")
@@ -134,12 +163,25 @@ class SSHConnection:
         Raises:
             SSHOperationError: If command execution fails
         """
+        # localhost on another port is usually a forwarded port to a different
+        # machine or a container, so only the standard port counts as local
+        if self.hostname in LOCAL_HOSTNAMES and self.port == 22:
+            # Same machine - reuse the local listing instead of a second round-trip
+            # (imported here so ssh_ops doesn't depend on zfs_ops at import time)
+            from .zfs_ops import list_datasets, ZFSOperationError
+            
+            try:
+                return list_datasets()
+            except ZFSOperationError as e:
+                raise SSHOperationError(f"Failed to list remote datasets: {e}")
+        
         stdout, stderr, exit_code = self.execute_command("zfs list -H -o name")
         
         if exit_code != 0:
             raise SSHOperationError(f"Failed to list remote datasets: {stderr}")
         
-        return [line.strip() for line in stdout.splitlines() if line.strip()]
+        # zfs list -H prints one bare name per line; only blank lines need skipping
+        return [line for line in stdout.splitlines() if line]
     
     def check_dataset_exists(self, dataset: str) -> bool:
         """
@@ -151,11 +193,34 @@ class SSHConnection:
         Returns:
             True if the dataset exists, False otherwise
         """
+        return self.check_datasets_exist([dataset])[dataset]
+    
+    def check_datasets_exist(self, datasets: List[str]) -> Dict[str, bool]:
+        """
+        Check which of several datasets exist on the remote server.
+        
+        All datasets are probed with a single zfs list call, so the cost is
+        one round-trip regardless of how many names are checked.
+        
+        Args:
+            datasets: Dataset names
+            
+        Returns:
+            Dictionary of dataset name to whether it exists
+        """
+        if not datasets:
+            return {}
+        
+        command = "zfs list -H -o name " + " ".join(shlex.quote(dataset) for dataset in datasets)
+        
         try:
-            stdout, stderr, exit_code = self.execute_command(f"zfs list -H {dataset}")
-            return exit_code == 0
+            # zfs list still prints the datasets it found when some are missing
+            stdout, stderr, exit_code = self.execute_command(command)
         except SSHOperationError:
-            return False
+            return {dataset: False for dataset in datasets}
+        
+        found = set(stdout.splitlines())
+        return {dataset: dataset in found for dataset in datasets}
     
     def __enter__(self):
         """Context manager entry."""
@@ -166,6 +231,87 @@ class SSHConnection:
         """Context manager exit."""
         self.disconnect()
 
+# Open connections keyed by (hostname, username, port, key_filename)
+_connection_pool: Dict[Tuple[str, Optional[str], int, Optional[str]], SSHConnection] = {}
+_connection_pool_lock = threading.Lock()
+
+def get_connection(
+    hostname: str,
+    username: Optional[str] = None,
+    port: int = 22,
+    key_filename: Optional[str] = None
+) -> SSHConnection:
+    """
+    Get a connected SSH connection from the pool, opening one if needed.
+    
+    Connections are reused across calls so repeated remote commands to the
+    same host only pay for the handshake and authentication once.
+    
+    Args:
+        hostname: Remote hostname or IP
+        username: SSH username (defaults to current user if None)
+        port: SSH port
+        key_filename: Path to private key file
+        
+    Returns:
+        Connected SSHConnection
+        
+    Raises:
+        SSHOperationError: If connection fails
+    """
+    key = (hostname, username, port, key_filename)
+    
+    with _connection_pool_lock:
+        connection = _connection_pool.get(key)
+        if connection is not None and _is_connection_active(connection):
+            return connection
+        # Stale connection - drop it and reconnect below
+        stale = _connection_pool.pop(key, None)
+    
+    if stale is not None:
+        stale.disconnect()
+    
+    # Connect without holding the lock, so a slow or unreachable host
+    # doesn't hold up connections to every other host
+    connection = SSHConnection(
+        hostname=hostname,
+        username=username,
+        port=port,
+        key_filename=key_filename
+    )
+    connection.connect()
+    connection.client.get_transport().set_keepalive(30)
+    
+    with _connection_pool_lock:
+        existing = _connection_pool.get(key)
+        if existing is not None and _is_connection_active(existing):
+            # Another thread connected to the same host in the meantime; keep theirs
+            duplicate, connection = connection, existing
+        else:
+            _connection_pool[key] = connection
+            duplicate = None
+    
+    if duplicate is not None:
+        duplicate.disconnect()
+    
+    return connection
+
+def _is_connection_active(connection: SSHConnection) -> bool:
+    """Check whether a pooled connection's transport is still usable."""
+    if connection.client is None:
+        return False
+    transport = connection.client.get_transport()
+    return transport is not None and transport.is_active()
+
+def close_all_connections() -> None:
+    """Close every pooled SSH connection."""
+    with _connection_pool_lock:
+        for connection in _connection_pool.values():
+            connection.disconnect()
+        _connection_pool.clear()
+
+atexit.register(close_all_connections)
+
 def test_ssh_connection(
     hostname: str, 
     username: Optional[str] = None,
@@ -5,23 +5,106 @@ This module provides functions for interacting with ZFS datasets and snapshots.
 """
 
 import logging
+import os
 import subprocess
+import shlex
+import shutil
 import re
-from typing import List, Dict, Optional, Tuple
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 
 logger = logging.getLogger('zfs_sync.core.zfs_ops')
 
+# Share one authenticated ssh connection per destination across transfers.
+# %C is a fixed-length hash of the connection, so the socket path stays well
+# under the 108-byte unix socket limit however long the user and host names are.
+SSH_MULTIPLEX_OPTIONS = [
+    '-o', 'ControlMaster=auto',
+    '-o', 'ControlPersist=600',
+    '-o', 'ControlPath=~/.ssh/cm-%C',
+]
+
+def _ssh_multiplex_options() -> List[str]:
+    """
+    Get the ssh options for connection sharing, creating ~/.ssh if needed.
+    
+    Returns:
+        SSH_MULTIPLEX_OPTIONS, or an empty list if ~/.ssh can't be created
+        (ssh then simply opens a fresh connection)
+    """
+    try:
+        os.makedirs(os.path.expanduser('~/.ssh'), mode=0o700, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"Not sharing ssh connections, can't create ~/.ssh: {e}")
+        return []
+    
+    return SSH_MULTIPLEX_OPTIONS
+
 class ZFSOperationError(Exception):
     """Exception raised for errors in ZFS operations."""
     pass
 
-def run_command(command: List[str], check: bool = True) -> Tuple[str, str]:
+# Absolute path of the zfs binary, looked up once (None if zfs isn't installed)
+_ZFS_BIN = shutil.which('zfs')
+
+# Seconds a dataset listing is reused before zfs list is run again
+DATASET_CACHE_TTL = 2.0
+
+# (time.monotonic() of the listing, dataset names), keyed by list_datasets arguments
+_dataset_cache: Dict[Tuple[Optional[str], Optional[str], Optional[int]], Tuple[float, List[str]]] = {}
+
+def invalidate_dataset_cache() -> None:
+    """Forget the cached dataset listings so the next call runs zfs list."""
+    _dataset_cache.clear()
+
+# Seconds fetched dataset properties are reused, and how many entries are kept
+PROPERTIES_CACHE_TTL = 5.0
+PROPERTIES_CACHE_SIZE = 1024
+
+# (time.monotonic() of the fetch, properties), keyed by (dataset, requested property names)
+_properties_cache: Dict[Tuple[str, Tuple[str, ...]], Tuple[float, Dict[str, str]]] = {}
+
+def invalidate_properties_cache(dataset: Optional[str] = None) -> None:
+    """
+    Forget cached dataset properties.
+    
+    Args:
+        dataset: Only forget this dataset's properties (all datasets if None)
+    """
+    if dataset is None:
+        _properties_cache.clear()
+        return
+    
+    for key in [key for key in _properties_cache if key[0] == dataset]:
+        _properties_cache.pop(key, None)
+
+def invalidate_caches() -> None:
+    """
+    Forget every cached dataset listing, property and snapshot listing.
+    
+    Called after anything that changes ZFS state (snapshots, sends,
+    receives, sanoid and syncoid runs), from zfs_ops and sanoid_ops alike.
+    """
+    # Imported here so zfs_ops has no module-level dependency on sanoid_ops
+    from .sanoid_ops import invalidate_snapshot_cache
+    
+    invalidate_dataset_cache()
+    invalidate_properties_cache()
+    invalidate_snapshot_cache()
+
+def run_command(command: List[str], check: bool = True, capture_stdout: bool = True) -> Tuple[str, str]:
     """
     Run a command and return its output.
     
     Args:
         command: List of command and arguments
         check: Whether to check the return code
+        capture_stdout: Whether to collect stdout; when False it is sent to
+            /dev/null and returned as an empty string
         
     Returns:
         Tuple of (stdout, stderr)
@@ -29,12 +112,13 @@ def run_command(command: List[str], check: bool = True) -> Tuple[str, str]:
     Raises:
         ZFSOperationError: If the command fails and check is True
     """
-    logger.debug(f"Running command: {' '.join(command)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Running command: {' '.join(command)}")
     
     try:
         process = subprocess.Popen(
-            command,
-            stdout=subprocess.PIPE,
+            resolve_executable(command),
+            stdout=subprocess.PIPE if capture_stdout else subprocess.DEVNULL,
             stderr=subprocess.PIPE,
             text=True
         )
@@ -43,20 +127,155 @@ def run_command(command: List[str], check: bool = True) -> Tuple[str, str]:
         if check and process.returncode != 0:
             raise ZFSOperationError(f"Command failed with exit code {process.returncode}: {stderr}")
         
-        return stdout, stderr
+        return stdout or '', stderr
     except Exception as e:
         logger.error(f"Error running command: {e}")
         raise ZFSOperationError(f"Error running command: {e}")
 
-def list_datasets() -> List[str]:
+def stream_command(command: List[str]) -> Iterator[str]:
+    """
+    Run a command and yield its output lines as they are produced.
+    
+    Args:
+        command: List of command and arguments
+        
+    Yields:
+        Lines of stdout without the trailing newline
+        
+    Raises:
+        ZFSOperationError: If the command can't be started or exits non-zero
     """
-    List all ZFS datasets.
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Streaming command: {' '.join(command)}")
     
+    # stderr goes to a temporary file rather than a pipe: nothing reads it
+    # until stdout is exhausted, and a full stderr pipe would block zfs forever
+    with tempfile.TemporaryFile() as stderr_file:
+        try:
+            process = subprocess.Popen(
+                resolve_executable(command),
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                text=True
+            )
+        except (OSError, ZFSOperationError) as e:
+            logger.error(f"Error running command: {e}")
+            raise ZFSOperationError(f"Error running command: {e}")
+        
+        with process:
+            for line in process.stdout:
+                yield line.rstrip('\n')
+        
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode('utf-8', errors='replace')
+    
+    if process.returncode != 0:
+        raise ZFSOperationError(f"Command failed with exit code {process.returncode}: {stderr}")
+
+def list_datasets(
+    dataset_type: Optional[str] = None,
+    root: Optional[str] = None,
+    depth: Optional[int] = None
+) -> List[str]:
+    """
+    List ZFS datasets.
+    
+    Passing a root makes zfs walk only that subtree instead of every pool
+    on the system. The listing is reused for DATASET_CACHE_TTL seconds, so
+    repeatedly opening a dataset picker doesn't run zfs list every time.
+    
+    Args:
+        dataset_type: Dataset type(s) to list, e.g. "filesystem" or
+            "filesystem,volume" (zfs's default if None)
+        root: Only list this dataset and its descendants
+        depth: Limit recursion below root to this many levels
+        
     Returns:
         List of dataset names
     """
-    stdout, _ = run_command(['zfs', 'list', '-H', '-o', 'name'])
-    return [line.strip() for line in stdout.splitlines() if line.strip()]
+    key = (dataset_type, root, depth)
+    
+    cached = _dataset_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < DATASET_CACHE_TTL:
+        return list(cached[1])
+    
+    datasets = list(iter_datasets(dataset_type, root, depth))
+    
+    _dataset_cache[key] = (time.monotonic(), datasets)
+    return list(datasets)
+
+def iter_datasets(
+    dataset_type: Optional[str] = None,
+    root: Optional[str] = None,
+    depth: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Iterate over ZFS datasets while zfs list is still running.
+    
+    Unlike list_datasets this isn't cached, and callers can start on the
+    first datasets before the whole listing has been produced.
+    
+    Args:
+        dataset_type: Dataset type(s) to list (zfs's default if None)
+        root: Only list this dataset and its descendants
+        depth: Limit recursion below root to this many levels
+        
+    Yields:
+        Dataset names
+    """
+    command = ['zfs', 'list', '-H', '-o', 'name']
+    if dataset_type:
+        command.extend(['-t', dataset_type])
+    if depth is not None:
+        command.extend(['-d', str(depth)])
+    elif root:
+        command.append('-r')
+    if root:
+        command.append(root)
+    
+    for line in stream_command(command):
+        line = line.strip()
+        if line:
+            yield line
+
+def list_datasets_many(dataset_types: List[str], root: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    List datasets of several types, running the zfs list calls concurrently.
+    
+    Each listing mostly waits on the kernel, so running them side by side
+    takes about as long as the slowest one instead of the sum of all.
+    
+    Args:
+        dataset_types: Dataset types to list, e.g. ["filesystem", "snapshot"]
+        root: Only list this dataset and its descendants
+        
+    Returns:
+        Dictionary of dataset type to list of dataset names
+    """
+    if not dataset_types:
+        return {}
+    
+    with ThreadPoolExecutor(max_workers=len(dataset_types)) as executor:
+        futures = {
+            dataset_type: executor.submit(list_datasets, dataset_type, root)
+            for dataset_type in dataset_types
+        }
+    
+    return {dataset_type: future.result() for dataset_type, future in futures.items()}
+
+def iter_snapshots(dataset: str) -> Iterator[str]:
+    """
+    Iterate over the snapshots of a dataset while zfs list is still running.
+    
+    Args:
+        dataset: Dataset name
+        
+    Yields:
+        Snapshot names
+    """
+    for line in stream_command(['zfs', 'list', '-H', '-t', 'snapshot', '-o', 'name', '-d', '1', dataset]):
+        if line:
+            yield line
 
 def list_snapshots(dataset: str) -> List[str]:
     """
@@ -68,8 +287,7 @@ def list_snapshots(dataset: str) -> List[str]:
     Returns:
         List of snapshot names
     """
-    stdout, _ = run_command(['zfs', 'list', '-H', '-t', 'snapshot', '-o', 'name', '-r', dataset])
-    return [line.strip() for line in stdout.splitlines() if line.strip()]
+    return list(iter_snapshots(dataset))
 
 def create_snapshot(dataset: str, snapshot_name: str) -> str:
     """
@@ -83,14 +301,18 @@ def create_snapshot(dataset: str, snapshot_name: str) -> str:
         Full snapshot name (dataset@snapshot_name)
     """
     full_snapshot_name = f"{dataset}@{snapshot_name}"
-    run_command(['zfs', 'snapshot', full_snapshot_name])
+    try:
+        run_command(['zfs', 'snapshot', full_snapshot_name])
+    finally:
+        invalidate_caches()
     return full_snapshot_name
 
 def send_snapshot(
     source_snapshot: str, 
     destination: str, 
     incremental_source: Optional[str] = None,
-    resume_token: Optional[str] = None
+    resume_token: Optional[str] = None,
+    modern_flags: bool = False
 ) -> None:
     """
     Send a snapshot to a destination.
@@ -100,12 +322,19 @@ def send_snapshot(
         destination: Destination (dataset or file)
         incremental_source: Source snapshot for incremental send
         resume_token: Resume token for resuming interrupted transfer
+        modern_flags: Send large blocks and embedded data as-is (-L -e).
+            Only enable this when the receiving pool has the large_blocks
+            and embedded_data features; older receivers reject the stream.
         
     Raises:
         ZFSOperationError: If the send operation fails
     """
     command = ['zfs', 'send']
     
+    # A resume token already records the flags of the original send
+    if modern_flags and not resume_token:
+        command.extend(['-L', '-e'])
+    
     if resume_token:
         command.extend(['-t', resume_token])
     elif incremental_source:
@@ -113,49 +342,110 @@ def send_snapshot(
     else:
         command.append(source_snapshot)
     
-    # If destination is a remote location, we'll handle it differently
+    # If destination is a remote location, receive over ssh
     if '@' in destination:
-        # Remote destination
         server, remote_dataset = destination.split(':', 1)
-        send_process = subprocess.Popen(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
+        # ssh hands the remote command to a shell, so quote it as one string
+        receive_command = ['ssh', *_ssh_multiplex_options(), server, ' '.join(shlex.quote(arg) for arg in ['zfs', 'receive', remote_dataset])]
+    else:
+        receive_command = ['zfs', 'receive', destination]
+    
+    try:
+        _run_send_pipeline(command, receive_command)
+    finally:
+        # A receive can create datasets and change their properties
+        invalidate_caches()
+
+def resolve_executable(command: List[str]) -> List[str]:
+    """
+    Replace the program name in a command with its absolute path.
+    
+    An absolute executable path together with close_fds=False lets
+    subprocess use posix_spawn instead of fork+exec, so starting a child
+    doesn't copy the page tables of a large TUI process. Passing
+    close_fds=False is safe because every fd Python opens is
+    non-inheritable (PEP 446); only the dup2'd stdio reaches the child.
+    
+    zfs is looked up once at import time; other programs are looked up
+    in PATH on each call.
+    
+    Args:
+        command: List of command and arguments
         
-        receive_command = ['ssh', server, 'zfs', 'receive', remote_dataset]
-        receive_process = subprocess.Popen(
-            receive_command,
-            stdin=send_process.stdout,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
+    Returns:
+        The command with its first element resolved via PATH, if found
         
-        send_process.stdout.close()
-        stdout, stderr = receive_process.communicate()
+    Raises:
+        ZFSOperationError: If the command is zfs and zfs isn't installed
+    """
+    if command[0] == 'zfs':
+        # Fail fast instead of paying for a PATH search and a failed exec each call
+        if _ZFS_BIN is None:
+            raise ZFSOperationError("zfs command not found")
+        return [_ZFS_BIN] + command[1:]
+    
+    executable = shutil.which(command[0])
+    if executable is None:
+        return command
+    return [executable] + command[1:]
+
+def _run_send_pipeline(send_command: List[str], receive_command: List[str]) -> None:
+    """
+    Pipe the output of a zfs send command into a receive command.
+    
+    Args:
+        send_command: zfs send command and arguments
+        receive_command: Receiving command and arguments (local or over ssh)
         
-        if receive_process.returncode != 0:
-            raise ZFSOperationError(f"Receive failed: {stderr}")
+    Raises:
+        ZFSOperationError: If either side of the pipeline fails
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Running pipeline: {' '.join(send_command)} | {' '.join(receive_command)}")
+    
+    # zfs send's stderr goes to a temporary file: nothing reads it until the
+    # receive has finished, and a full stderr pipe would stall the send, and
+    # with it the receive waiting for EOF, forever.
+    with tempfile.TemporaryFile() as send_stderr_file:
+        try:
+            send_process = subprocess.Popen(
+                resolve_executable(send_command),
+                stdout=subprocess.PIPE,
+                stderr=send_stderr_file,
+                close_fds=False
+            )
+        except OSError as e:
+            raise ZFSOperationError(f"Error running command: {e}")
         
-        if send_process.wait() != 0:
-            _, send_stderr = send_process.communicate()
-            raise ZFSOperationError(f"Send failed: {send_stderr.decode('utf-8')}")
-    else:
-        # Local destination
-        command.extend(['|', 'zfs', 'receive', destination])
-        # Use shell=True for pipe redirection
-        process = subprocess.Popen(
-            ' '.join(command),
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        stdout, stderr = process.communicate()
+        with send_process:
+            # Both stages stay in binary mode; only stderr is decoded, and only on failure
+            try:
+                receive_process = subprocess.Popen(
+                    resolve_executable(receive_command),
+                    stdin=send_process.stdout,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    close_fds=False
+                )
+            except (OSError, ZFSOperationError) as e:
+                # Don't leave zfs send running with no reader
+                send_process.kill()
+                raise ZFSOperationError(f"Error running command: {e}")
+            
+            # Drop our copy of the pipe so zfs send gets SIGPIPE if the receiver exits
+            send_process.stdout.close()
+            _, stderr = receive_process.communicate()
+            
+            if receive_process.returncode != 0:
+                # Don't leave zfs send running (or as a zombie) behind a failed receive
+                send_process.kill()
+                raise ZFSOperationError(f"Receive failed: {stderr.decode('utf-8', errors='replace')}")
         
-        if process.returncode != 0:
-            raise ZFSOperationError(f"Send/receive failed: {stderr}")
+        # Leaving the with block has waited for zfs send to exit
+        if send_process.returncode != 0:
+            send_stderr_file.seek(0)
+            send_stderr = send_stderr_file.read().decode('utf-8', errors='replace')
+            raise ZFSOperationError(f"Send failed: {send_stderr}")
 
 def get_resume_token() -> Optional[str]:
     """
@@ -180,19 +470,151 @@ def get_dataset_properties(dataset: str) -> Dict[str, str]:
         
     Returns:
         Dictionary of property name to value
+        
+    Raises:
+        ZFSOperationError: If the properties can't be read
+    """
+    properties = get_dataset_properties_bulk([dataset])
+    if dataset not in properties:
+        raise ZFSOperationError(f"Failed to get properties of {dataset}")
+    return properties[dataset]
+
+def get_dataset_properties_bulk(
+    datasets: List[str],
+    properties: Optional[List[str]] = None
+) -> Dict[str, Dict[str, str]]:
     """
-    stdout, _ = run_command(['zfs', 'get', 'all', '-H', '-o', 'property,value', dataset])
-    properties = {}
+    Get properties of several datasets with a single zfs get call.
     
+    Results are reused for PROPERTIES_CACHE_TTL seconds; only datasets
+    without a fresh cached entry are passed to zfs get. A dataset that
+    can't be read (e.g. destroyed in the meantime) is left out of the
+    result rather than failing the others.
+    
+    Args:
+        datasets: Dataset names
+        properties: Property names to fetch (all properties if None)
+        
+    Returns:
+        Dictionary of dataset name to a dictionary of property name to value
+        
+    Raises:
+        ZFSOperationError: If zfs get returned nothing for any of the datasets
+    """
+    if not datasets:
+        return {}
+    
+    requested = tuple(sorted(properties)) if properties else ()
+    now = time.monotonic()
+    
+    result: Dict[str, Dict[str, str]] = {}
+    missing = []
+    for dataset in datasets:
+        cached = _properties_cache.get((dataset, requested))
+        if cached is not None and now - cached[0] < PROPERTIES_CACHE_TTL:
+            result[dataset] = dict(cached[1])
+        else:
+            missing.append(dataset)
+    
+    if not missing:
+        return result
+    
+    # Ask in sorted order so zfs visits parents before children and siblings
+    # together, and never pass the same dataset twice
+    missing = sorted(set(missing))
+    command = ['zfs', 'get', '-H', '-o', 'name,property,value', ','.join(requested) if requested else 'all']
+    
+    # zfs get still prints the datasets it could read when others fail, so
+    # don't let one bad name throw away the rest of the batch
+    stdout, stderr = run_command(command + missing, check=False)
+    
+    # Property names repeat for every dataset; interning lets all the
+    # dictionaries share one string per name and compare keys by identity
+    fetched: Dict[str, Dict[str, str]] = defaultdict(dict)
     for line in stdout.splitlines():
-        if not line.strip():
-            continue
+        parts = line.split('\t', 2)
+        if len(parts) == 3:
+            name, prop, value = parts
+            fetched[name][sys.intern(prop)] = value
+    
+    failed = [dataset for dataset in missing if dataset not in fetched]
+    if failed:
+        if len(failed) == len(missing):
+            raise ZFSOperationError(f"Failed to get dataset properties: {stderr.strip()}")
+        logger.warning(f"Skipping datasets whose properties couldn't be read: {', '.join(failed)}")
+    
+    now = time.monotonic()
+    for name, props in fetched.items():
+        # Re-insert so the dict stays ordered from least to most recently fetched
+        _properties_cache.pop((name, requested), None)
+        _properties_cache[(name, requested)] = (now, props)
+        result[name] = dict(props)
+    
+    # Drop the least recently fetched entries once the cache is full
+    while len(_properties_cache) > PROPERTIES_CACHE_SIZE:
+        _properties_cache.pop(next(iter(_properties_cache)), None)
+    
+    return result
+
+def iter_dataset_properties(
+    datasets: Iterable[str],
+    properties: Optional[List[str]] = None
+) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """
+    Iterate over dataset properties while zfs get is still running.
+    
+    zfs get prints all properties of one dataset before moving on to the
+    next, so each dataset can be handed to the caller as soon as its
+    block is complete. Results aren't cached. As with
+    get_dataset_properties_bulk, a dataset that can't be read is skipped
+    with a warning rather than failing the others.
+    
+    Args:
+        datasets: Dataset names (any iterable, e.g. from iter_datasets)
+        properties: Property names to fetch (all properties if None)
         
-        parts = line.split('\t')
-        if len(parts) >= 2:
-            properties[parts[0]] = parts[1]
+    Yields:
+        (dataset name, dictionary of property name to value) tuples
+        
+    Raises:
+        ZFSOperationError: If zfs get returned nothing for any of the datasets
+    """
+    datasets = list(datasets)
+    if not datasets:
+        return
     
-    return properties
+    command = ['zfs', 'get', '-H', '-o', 'name,property,value', ','.join(properties) if properties else 'all']
+    
+    seen = set()
+    current = None
+    current_properties: Dict[str, str] = {}
+    error = None
+    try:
+        for line in stream_command(command + datasets):
+            parts = line.split('\t', 2)
+            if len(parts) != 3:
+                continue
+            name, prop, value = parts
+            if name != current:
+                if current is not None:
+                    seen.add(current)
+                    yield current, current_properties
+                current = name
+                current_properties = {}
+            current_properties[sys.intern(prop)] = value
+    except ZFSOperationError as e:
+        # zfs get exits non-zero if any name was bad, after printing the rest
+        error = e
+    
+    if current is not None:
+        seen.add(current)
+        yield current, current_properties
+    
+    if error is not None:
+        if not seen:
+            raise error
+        failed = sorted(set(datasets) - seen)
+        logger.warning(f"Skipping datasets whose properties couldn't be read: {', '.join(failed)}")
 
 def dataset_exists(dataset: str) -> bool:
     """
@@ -205,7 +627,7 @@ def dataset_exists(dataset: str) -> bool:
         True if the dataset exists, False otherwise
     """
     try:
-        run_command(['zfs', 'list', '-H', dataset])
+        run_command(['zfs', 'list', '-H', '-o', 'name', dataset], capture_stdout=False)
         return True
     except ZFSOperationError:
         return False
@@ -220,8 +642,25 @@ def snapshot_exists(snapshot: str) -> bool:
     Returns:
         True if the snapshot exists, False otherwise
     """
+    return get_snapshot_guid(snapshot) is not None
+
+def get_snapshot_guid(snapshot: str) -> Optional[str]:
+    """
+    Get the GUID of a snapshot.
+    
+    A single zfs get answers both whether the snapshot exists and which
+    snapshot it is, so callers comparing snapshots across hosts don't need
+    a separate existence check.
+    
+    Args:
+        snapshot: Snapshot name (dataset@snapshot_name)
+        
+    Returns:
+        The snapshot GUID, or None if the snapshot doesn't exist
+    """
     try:
-        run_command(['zfs', 'list', '-H', '-t', 'snapshot', snapshot])
-        return True
+        stdout, _ = run_command(['zfs', 'get', '-H', '-p', '-o', 'value', 'guid', snapshot])
     except ZFSOperationError:
-        return False
\ No newline at end of file
+        return None
+    
+    return stdout.strip() or None
\ No newline at end of file
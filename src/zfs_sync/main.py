@@ -6,27 +6,89 @@ ZFS Sync Tool - A TUI tool for synchronizing ZFS datasets between servers using
 import os
 import sys
 import argparse
+import atexit
 import logging
 import json
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 
+from .core.config_manager import get_config_path
+
+# (log level, log file) the installed handlers were set up for
+_logging_configured_key = None
+
+# The handler on the root logger, its background listener, and the handlers
+# the listener writes to
+_queue_handler = None
+_log_listener = None
+_log_handlers = []
+
+def _shutdown_logging():
+    """Stop the log listener and close every handler set up by setup_logging."""
+    global _logging_configured_key, _queue_handler, _log_listener
+    
+    if _log_listener is None:
+        return
+    
+    logging.getLogger().removeHandler(_queue_handler)
+    
+    # Stopping the listener drains whatever is still queued
+    _log_listener.stop()
+    
+    for handler in _log_handlers:
+        handler.close()
+    
+    _log_handlers.clear()
+    _queue_handler = None
+    _log_listener = None
+    _logging_configured_key = None
+
+atexit.register(_shutdown_logging)
+
 # Set up logging
 def setup_logging(debug=False):
     """Set up logging configuration."""
+    global _logging_configured_key, _queue_handler, _log_listener
+    
     log_dir = Path.home() / '.zfs_sync'
+    log_file = log_dir / 'zfs_sync.log'
+    log_level = logging.DEBUG if debug else logging.INFO
+    
+    # Calling this again with the same settings must not stack another set of handlers
+    key = (log_level, str(log_file))
+    if key == _logging_configured_key:
+        return logging.getLogger('zfs_sync')
+    
+    # Different settings: tear the old handlers down completely first
+    _shutdown_logging()
+    
     log_dir.mkdir(exist_ok=True)
     
-    log_level = logging.DEBUG if debug else logging.INFO
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    # Rotate so a long-running --debug session can't grow the log without bound
+    file_handler = RotatingFileHandler(log_file, maxBytes=10_000_000, backupCount=3, encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
     
-    logging.basicConfig(
-        level=log_level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_dir / 'zfs_sync.log'),
-            logging.StreamHandler()
-        ]
-    )
+    # Log calls only enqueue the record; a background thread does the writes.
+    # Records are written as they arrive, so the log stays current for anyone
+    # tailing it and nothing is lost if the process is killed.
+    log_queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    
+    _queue_handler = QueueHandler(log_queue)
+    _log_listener = listener
+    _log_handlers.extend([file_handler, stream_handler])
+    
+    root_logger = logging.getLogger()
+    root_logger.setLevel(log_level)
+    root_logger.addHandler(_queue_handler)
+    
+    _logging_configured_key = key
     
     return logging.getLogger('zfs_sync')
 
@@ -80,12 +142,6 @@ def parse_arguments():
     
     return parser.parse_args()
 
-def get_config_path() -> Path:
-    """Get the path to the configuration file."""
-    config_dir = Path.home() / '.zfs_sync'
-    config_dir.mkdir(exist_ok=True)
-    return config_dir / 'config.json'
-
 def load_config() -> Dict[str, Any]:
     """Load the configuration from the configuration file."""
     config_path = get_config_path()
@@ -18,9 +18,7 @@ from zfs_sync.tui.widgets.server_config import ServerConfig
 from zfs_sync.tui.widgets.sync_options import SyncOptions
 from zfs_sync.tui.widgets.progress_display import ProgressDisplay
 from zfs_sync.core.config_manager import load_config, save_config, add_saved_configuration
-from zfs_sync.core.zfs_ops import list_datasets
-from zfs_sync.core.ssh_ops import SSHConnection
-from zfs_sync.core.sanoid_ops import sync_dataset
+from zfs_sync.core.zfs_ops import invalidate_caches
 
 logger = logging.getLogger('zfs_sync.tui.screens.main_screen')
 
@@ -38,6 +36,7 @@ class MainScreen(Screen):
         super().__init__(*args, **kwargs)
         self.config = load_config()
         self.initial_job = initial_job
+        self.index_saved_configurations()
         
         if initial_job and initial_job in self.config.get("jobs", {}):
             # Load job configuration
@@ -115,36 +114,57 @@ class MainScreen(Screen):
         
         yield Footer()
     
-    def on_mount(self) -> None:
+    async def on_mount(self) -> None:
         """Called when the screen is mounted."""
         self.query_one("#title").styles.text_align = "center"
         self.query_one("#subtitle").styles.text_align = "center"
         
         # Load saved configurations
-        self.load_saved_configurations()
+        await self.load_saved_configurations()
     
-    def load_saved_configurations(self) -> None:
+    def index_saved_configurations(self) -> None:
+        """Build the name lookup for saved configurations."""
+        self.saved_configs_by_name = {
+            config.get("name"): config
+            for config in self.config.get("saved_configurations", [])
+        }
+    
+    async def load_saved_configurations(self) -> None:
         """Load saved configurations."""
         saved_configs_list = self.query_one("#saved-configs-list", Vertical)
-        saved_configs_list.remove_children()
+        
+        # Wait for the old entries to go so their ids are free again
+        await saved_configs_list.remove_children()
         
         saved_configs = self.config.get("saved_configurations", [])
         
         if not saved_configs:
-            saved_configs_list.mount(Static("No saved configurations found.", classes="empty-message"))
+            await saved_configs_list.mount(Static("No saved configurations found.", classes="empty-message"))
             return
         
-        for config in saved_configs:
+        # Build every entry first and mount them together in a single batch,
+        # rather than paying for a mount and layout pass per configuration
+        items = []
+        for index, config in enumerate(saved_configs):
             name = config.get("name", "Unnamed")
             source = config.get("source_dataset", "")
             destination = f"{config.get('destination_server', '')}:{config.get('destination_dataset', '')}"
             
-            with Vertical(classes="saved-config-item"):
-                with Horizontal():
-                    yield Static(f"**{name}**", classes="saved-config-name")
-                    yield Button("Load", id=f"load-config-{name}", variant="primary", classes="load-config-button")
-                yield Static(f"Source: {source}", classes="saved-config-detail")
-                yield Static(f"Destination: {destination}", classes="saved-config-detail")
+            items.append(
+                Vertical(
+                    Horizontal(
+                        Static(f"**{name}**", classes="saved-config-name"),
+                        # Names may contain characters that aren't valid in ids, so the
+                        # id uses the position and the name travels on the button
+                        Button("Load", id=f"load-config-{index}", name=name, variant="primary", classes="load-config-button"),
+                    ),
+                    Static(f"Source: {source}", classes="saved-config-detail"),
+                    Static(f"Destination: {destination}", classes="saved-config-detail"),
+                    classes="saved-config-item",
+                )
+            )
+        
+        await saved_configs_list.mount(*items)
     
     def on_source_dataset_selected(self, dataset: str) -> None:
         """
@@ -193,8 +213,7 @@ class MainScreen(Screen):
         elif button_id == "delete-config":
             self.delete_config_dialog()
         elif button_id.startswith("load-config-"):
-            config_name = button_id[len("load-config-"):]
-            self.load_saved_config(config_name)
+            self.load_saved_config(event.button.name)
     
     def action_start_sync(self) -> None:
         """Start the synchronization process."""
@@ -204,14 +223,17 @@ class MainScreen(Screen):
         """Save the current configuration."""
         self.save_config()
     
-    def action_refresh(self) -> None:
+    async def action_refresh(self) -> None:
         """Refresh the UI."""
+        # An explicit refresh should show what is on disk now, not cached listings
+        invalidate_caches()
+        
         # Refresh dataset selector
         dataset_selector = self.query_one("#source-dataset-selector", DatasetSelector)
         dataset_selector.refresh_datasets()
         
         # Refresh saved configurations
-        self.load_saved_configurations()
+        await self.load_saved_configurations()
     
     def start_sync(self) -> None:
         """Start the synchronization process."""
@@ -328,9 +350,10 @@ class MainScreen(Screen):
             
             # Reload the configuration
             self.config = load_config()
+            self.index_saved_configurations()
             
             # Refresh the saved configurations list
-            self.load_saved_configurations()
+            self.call_later(self.load_saved_configurations)
             
             self.app.notify(f"Configuration saved as '{config_name}'")
         except Exception as e:
@@ -350,24 +373,23 @@ class MainScreen(Screen):
         Args:
             config_name: Name of the configuration to load
         """
-        # Find the configuration with the given name
-        for config in self.config.get("saved_configurations", []):
-            if config.get("name") == config_name:
-                # Load the configuration
-                self.source_dataset = config.get("source_dataset", "")
-                self.destination_server = config.get("destination_server", "")
-                self.destination_dataset = config.get("destination_dataset", "")
-                self.sync_options = config.get("sync_options", {})
-                
-                # Update the UI
-                # This is a simplified version - in a real implementation, we would
-                # update all the widgets with the new values
-                
-                # Switch to the configuration tab
-                tabs = self.query_one("#main-tabs", TabbedContent)
-                tabs.active = "config-tab"
-                
-                self.app.notify(f"Loaded configuration '{config_name}'")
-                return
+        config = self.saved_configs_by_name.get(config_name)
+        if config is None:
+            self.app.notify(f"Configuration '{config_name}' not found", severity="error")
+            return
+        
+        # Load the configuration
+        self.source_dataset = config.get("source_dataset", "")
+        self.destination_server = config.get("destination_server", "")
+        self.destination_dataset = config.get("destination_dataset", "")
+        self.sync_options = config.get("sync_options", {})
+        
+        # Update the UI
+        # This is a simplified version - in a real implementation, we would
+        # update all the widgets with the new values
+        
+        # Switch to the configuration tab
+        tabs = self.query_one("#main-tabs", TabbedContent)
+        tabs.active = "config-tab"
         
-        self.app.notify(f"Configuration '{config_name}' not found", severity="error")
\ No newline at end of file
+        self.app.notify(f"Loaded configuration '{config_name}'")
\ No newline at end of file
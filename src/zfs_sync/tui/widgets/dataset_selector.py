@@ -11,7 +11,7 @@ from textual.widgets import Select, SelectionList, SelectionType
 from textual.widgets.selection_list import Selection
 from textual.reactive import reactive
 
-from zfs_sync.core.zfs_ops import list_datasets
+from zfs_sync.core.zfs_ops import list_datasets, invalidate_dataset_cache
 
 logger = logging.getLogger('zfs_sync.tui.widgets.dataset_selector')
 
@@ -49,7 +49,14 @@ class DatasetSelector(SelectionList):
     def refresh_datasets(self) -> None:
         """Refresh the list of datasets."""
         try:
-            self.datasets = list_datasets()
+            datasets = list_datasets()
+            
+            # Skip rebuilding the options when nothing has changed
+            if datasets == self.datasets:
+                logger.debug(f"Datasets unchanged: {len(datasets)} found")
+                return
+            
+            self.datasets = datasets
             
             # Convert datasets to Selection objects
             selections = [
@@ -68,6 +75,8 @@ class DatasetSelector(SelectionList):
     
     def action_refresh(self) -> None:
         """Refresh the list of datasets."""
+        # An explicit refresh should run zfs list rather than reuse a cached listing
+        invalidate_dataset_cache()
         self.refresh_datasets()
     
     def on_selection_list_selected(self, event) -> None:
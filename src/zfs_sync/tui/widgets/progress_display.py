@@ -65,6 +65,15 @@ class ProgressDisplay(Vertical):
     
     def on_mount(self) -> None:
         """Called when the widget is mounted."""
+        # Look the child widgets up once; progress updates and the elapsed
+        # time timer would otherwise walk the DOM on every call
+        self._status_text = self.query_one("#status-text", Static)
+        self._operation_text = self.query_one("#operation-text", Static)
+        self._progress_bar = self.query_one("#progress-bar", ProgressBar)
+        self._elapsed_time = self.query_one("#elapsed-time", Static)
+        self._estimated_time = self.query_one("#estimated-time", Static)
+        self._progress_log = self.query_one("#progress-log", Log)
+        
         self.set_interval(1.0, self.update_elapsed_time)
     
     def update_elapsed_time(self) -> None:
@@ -74,8 +83,7 @@ class ProgressDisplay(Vertical):
             elapsed_text = self.format_time(elapsed)
             
             # Update elapsed time display
-            elapsed_time = self.query_one("#elapsed-time", Static)
-            elapsed_time.update(elapsed_text)
+            self._elapsed_time.update(elapsed_text)
             
             # Update estimated time display if progress > 0
             if self.progress > 0:
@@ -84,8 +92,7 @@ class ProgressDisplay(Vertical):
                 
                 if estimated_remaining > 0:
                     estimated_text = self.format_time(estimated_remaining)
-                    estimated_time = self.query_one("#estimated-time", Static)
-                    estimated_time.update(estimated_text)
+                    self._estimated_time.update(estimated_text)
     
     def format_time(self, seconds: float) -> str:
         """
@@ -115,17 +122,11 @@ class ProgressDisplay(Vertical):
         self.end_time = 0.0
         
         # Update UI elements
-        status_text = self.query_one("#status-text", Static)
-        operation_text = self.query_one("#operation-text", Static)
-        progress_bar = self.query_one("#progress-bar", ProgressBar)
-        elapsed_time = self.query_one("#elapsed-time", Static)
-        estimated_time = self.query_one("#estimated-time", Static)
-        
-        status_text.update("Running")
-        operation_text.update(operation)
-        progress_bar.progress = 0.0
-        elapsed_time.update("00:00:00")
-        estimated_time.update("--:--:--")
+        self._status_text.update("Running")
+        self._operation_text.update(operation)
+        self._progress_bar.progress = 0.0
+        self._elapsed_time.update("00:00:00")
+        self._estimated_time.update("--:--:--")
         
         # Log the operation start
         self.log(f"[bold green]Started:[/bold green] {operation}")
@@ -138,11 +139,14 @@ class ProgressDisplay(Vertical):
             progress: Progress value (0.0 to 1.0)
             message: Optional progress message
         """
-        self.progress = max(0.0, min(1.0, progress))
+        progress = max(0.0, min(1.0, progress))
+        
+        # Only touch the progress bar when the displayed percentage changes,
+        # so frequent small updates don't each trigger a redraw
+        if int(progress * 100) != int(self.progress * 100):
+            self._progress_bar.progress = progress
         
-        # Update progress bar
-        progress_bar = self.query_one("#progress-bar", ProgressBar)
-        progress_bar.progress = self.progress
+        self.progress = progress
         
         # Log the progress message if provided
         if message:
@@ -161,13 +165,10 @@ class ProgressDisplay(Vertical):
         self.end_time = time.time()
         
         # Update UI elements
-        status_text = self.query_one("#status-text", Static)
-        progress_bar = self.query_one("#progress-bar", ProgressBar)
-        
-        status_text.update("[green]Success[/green]" if success else "[red]Failed[/red]")
+        self._status_text.update("[green]Success[/green]" if success else "[red]Failed[/red]")
         
         if success:
-            progress_bar.progress = 1.0
+            self._progress_bar.progress = 1.0
         
         # Log the operation completion
         if success:
@@ -186,13 +187,11 @@ class ProgressDisplay(Vertical):
         Args:
             message: Log message
         """
-        log = self.query_one("#progress-log", Log)
-        log.write(message)
+        self._progress_log.write(message)
     
     def clear_log(self) -> None:
         """Clear the log."""
-        log = self.query_one("#progress-log", Log)
-        log.clear()
+        self._progress_log.clear()
     
     def reset(self) -> None:
         """Reset the progress display."""
@@ -203,17 +202,11 @@ class ProgressDisplay(Vertical):
         self.end_time = 0.0
         
         # Update UI elements
-        status_text = self.query_one("#status-text", Static)
-        operation_text = self.query_one("#operation-text", Static)
-        progress_bar = self.query_one("#progress-bar", ProgressBar)
-        elapsed_time = self.query_one("#elapsed-time", Static)
-        estimated_time = self.query_one("#estimated-time", Static)
-        
-        status_text.update("Idle")
-        operation_text.update("")
-        progress_bar.progress = 0.0
-        elapsed_time.update("00:00:00")
-        estimated_time.update("--:--:--")
+        self._status_text.update("Idle")
+        self._operation_text.update("")
+        self._progress_bar.progress = 0.0
+        self._elapsed_time.update("00:00:00")
+        self._estimated_time.update("--:--:--")
         
         # Clear the log
         self.clear_log()
\ No newline at end of file
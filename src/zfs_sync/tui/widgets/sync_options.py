@@ -5,7 +5,7 @@ This module provides a widget for configuring ZFS synchronization options.
 """
 
 import logging
-from typing import Callable, Optional, Dict, Any, List
+from typing import Callable, Optional, Dict, Any, List, Tuple
 
 from textual.app import ComposeResult
 from textual.containers import Vertical, Horizontal
@@ -14,6 +14,30 @@ from textual.reactive import reactive
 
 logger = logging.getLogger('zfs_sync.tui.widgets.sync_options')
 
+# syncoid --sendoptions flags that take the following word as their value
+SENDOPTIONS_WITH_VALUE = "oxX"
+
+def split_sendoptions(sendoptions: str) -> Tuple[str, List[str]]:
+    """
+    Split a syncoid --sendoptions string into its bare flags and the rest.
+    
+    Args:
+        sendoptions: Value of the sendoptions option, e.g. "Lc o compression=lz4"
+        
+    Returns:
+        Tuple of (flag letters, remaining words in their original order)
+    """
+    flags = ""
+    others = []
+    takes_value = False
+    for word in sendoptions.split():
+        if not takes_value and word.isalpha() and word[-1] not in SENDOPTIONS_WITH_VALUE:
+            flags += word
+        else:
+            others.append(word)
+        takes_value = not takes_value and word.isalpha() and word[-1] in SENDOPTIONS_WITH_VALUE
+    return flags, others
+
 class SyncOptions(Vertical):
     """Widget for configuring ZFS synchronization options."""
     
@@ -22,6 +46,7 @@ class SyncOptions(Vertical):
     create_bookmark = reactive(True)
     preserve_properties = reactive(True)
     no_stream = reactive(False)
+    large_blocks = reactive(False)
     
     def __init__(
         self,
@@ -42,6 +67,7 @@ class SyncOptions(Vertical):
         super().__init__(id=id, name=name)
         self.on_options_change_callback = on_options_change
         self.initial_options = initial_options or {}
+        self.sendoptions = self.initial_options.get("sendoptions", "")
     
     def compose(self) -> ComposeResult:
         """Compose the widget layout."""
@@ -91,6 +117,15 @@ class SyncOptions(Vertical):
                 id="no-stream-switch",
             )
         
+        # Off by default: -L and -e need the large_blocks and embedded_data
+        # features on the receiving pool, and older receivers reject the stream
+        with Horizontal(classes="sync-option-row"):
+            yield Label("Large Blocks / Embedded Data:", classes="sync-option-label")
+            yield Switch(
+                value=self.has_large_blocks_flag(),
+                id="large-blocks-switch",
+            )
+        
         with Horizontal(classes="sync-option-row"):
             yield Label("Advanced Options:", classes="sync-option-label")
             yield Button("Configure", id="advanced-options-button", variant="primary")
@@ -107,6 +142,33 @@ class SyncOptions(Vertical):
         self.create_bookmark = self.initial_options.get("create_bookmark", True)
         self.preserve_properties = self.initial_options.get("preserve_properties", True)
         self.no_stream = self.initial_options.get("no_stream", False)
+        self.large_blocks = self.has_large_blocks_flag()
+    
+    def has_large_blocks_flag(self) -> bool:
+        """
+        Check whether the saved sendoptions include -L.
+        
+        Returns:
+            True if the large blocks flag is set
+        """
+        flags, _ = split_sendoptions(self.sendoptions)
+        return "L" in flags
+    
+    def merge_sendoptions(self) -> str:
+        """
+        Merge the large blocks switch into the saved sendoptions.
+        
+        Any other flags or valued options the configuration already had
+        are kept; only L and e are added or removed.
+        
+        Returns:
+            The sendoptions string to pass to syncoid
+        """
+        flags, others = split_sendoptions(self.sendoptions)
+        flags = flags.replace("L", "").replace("e", "")
+        if self.large_blocks:
+            flags += "Le"
+        return " ".join(([flags] if flags else []) + others)
     
     def on_switch_changed(self, event) -> None:
         """Called when a switch value changes."""
@@ -120,6 +182,8 @@ class SyncOptions(Vertical):
             self.preserve_properties = event.value
         elif switch_id == "no-stream-switch":
             self.no_stream = event.value
+        elif switch_id == "large-blocks-switch":
+            self.large_blocks = event.value
         
         # Notify about options change
         if self.on_options_change_callback:
@@ -159,6 +223,7 @@ class SyncOptions(Vertical):
         self.create_bookmark = True
         self.preserve_properties = True
         self.no_stream = False
+        self.large_blocks = False
         
         # Update UI elements
         self.query_one("#recursive-switch", Switch).value = self.recursive
@@ -166,6 +231,7 @@ class SyncOptions(Vertical):
         self.query_one("#create-bookmark-switch", Switch).value = self.create_bookmark
         self.query_one("#preserve-properties-switch", Switch).value = self.preserve_properties
         self.query_one("#no-stream-switch", Switch).value = self.no_stream
+        self.query_one("#large-blocks-switch", Switch).value = self.large_blocks
         
         # Notify about options change
         if self.on_options_change_callback:
@@ -189,13 +255,20 @@ class SyncOptions(Vertical):
         Returns:
             Sync options dictionary
         """
-        return {
+        options = {
             "recursive": self.recursive,
             "compress": self.compress,
             "create-bookmark": self.create_bookmark,
             "preserve-properties": self.preserve_properties,
             "no-stream": self.no_stream,
         }
+        
+        # Passed through to zfs send by syncoid; the switch adds -L -e
+        sendoptions = self.merge_sendoptions()
+        if sendoptions:
+            options["sendoptions"] = sendoptions
+        
+        return options
     
     def set_options(self, options: Dict[str, Any]) -> None:
         """
@@ -209,10 +282,13 @@ class SyncOptions(Vertical):
         self.create_bookmark = options.get("create-bookmark", True)
         self.preserve_properties = options.get("preserve-properties", True)
         self.no_stream = options.get("no-stream", False)
+        self.sendoptions = options.get("sendoptions", "")
+        self.large_blocks = self.has_large_blocks_flag()
         
         # Update UI elements
         self.query_one("#recursive-switch", Switch).value = self.recursive
         self.query_one("#compress-select", Select).value = self.compress
         self.query_one("#create-bookmark-switch", Switch).value = self.create_bookmark
         self.query_one("#preserve-properties-switch", Switch).value = self.preserve_properties
-        self.query_one("#no-stream-switch", Switch).value = self.no_stream
\ No newline at end of file
+        self.query_one("#no-stream-switch", Switch).value = self.no_stream
+        self.query_one("#large-blocks-switch", Switch).value = self.large_blocks
\ No newline at end of file